@@ -1,99 +1,308 @@
 from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import yfinance as yf
 import pandas as pd
 import json
-import plotly
-import plotly.graph_objects as go
+import plotly.io
 from datetime import datetime, timedelta
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import requests
 import re
+import hashlib
 import threading
 import time
+from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
+from cachetools import TTLCache
+from indicators import rsi_nb, macd_nb, bollinger_nb, rolling_mean_std, compute_all
+
+# orjson serializes NumPy-backed traces without boxing each element
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """jsonify() provider that handles the ndarrays carried by chart dicts."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.ndarray):
+            if o.dtype.kind == "f":
+                return np.where(np.isnan(o), None, o).tolist()  # NaN isn't valid JSON
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 analyzer = SentimentIntensityAnalyzer()
 
+# ─── YFINANCE RESPONSE CACHE ─────────────────────────────
+# Yahoo round trips dominate request latency; reuse recent responses
+_hist_cache = TTLCache(maxsize=512, ttl=60)        # daily bars
+_intraday_cache = TTLCache(maxsize=128, ttl=10)    # 1m / 5m bars
+_info_cache = TTLCache(maxsize=256, ttl=300)       # ticker.info, ticker.news
+_opt_cache = TTLCache(maxsize=256, ttl=600)        # expirations + option chains
+_profile_cache = TTLCache(maxsize=256, ttl=3600)   # sector/industry/P/E etc. for /api/stock/info
+_chart_cache = TTLCache(maxsize=512, ttl=300)      # rendered charts, keyed on a digest of their bars
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def _key_lock(key):
+    return threading.Lock()
+
+
+def _cached(cache, key, fetch, fresh=False):
+    """Return cache[key], calling fetch() only once per miss even under concurrent requests.
+
+    fresh=True drops any cached entry first, forcing a refetch.
+    """
+    with _cache_lock:
+        if fresh:
+            cache.pop(key, None)
+        value = cache.get(key)
+    if value is not None:
+        return value
+    with _key_lock(key):
+        with _cache_lock:
+            value = cache.get(key)
+        if value is None:
+            value = fetch()
+            with _cache_lock:
+                cache[key] = value
+    return value
+
+
+def _get_history(sym, period, interval="1d", fresh=False):
+    cache = _intraday_cache if interval.endswith(("m", "h")) else _hist_cache
+    return _cached(cache, ("hist", sym, period, interval),
+                   lambda: yf.Ticker(sym).history(period=period, interval=interval), fresh)
+
+
+def _hist_digest(hist):
+    """Short digest of the OHLCV bars; charts built from the same bars come out identical."""
+    h = hashlib.blake2b(hist.index.asi8.tobytes(), digest_size=8)
+    h.update(hist[["Open", "High", "Low", "Close", "Volume"]].to_numpy(np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _bypass():
+    """True when the caller asked to skip the caches (?bypass=1)."""
+    return request.args.get("bypass", "").lower() in ("1", "true", "yes")
+
+
+def _get_info(sym):
+    return _cached(_info_cache, ("info", sym), lambda: yf.Ticker(sym).info)
+
+
+def _get_news(sym):
+    return _cached(_info_cache, ("news", sym), lambda: yf.Ticker(sym).news or [])
+
+
+def _get_option_dates(sym):
+    return _cached(_opt_cache, ("dates", sym), lambda: yf.Ticker(sym).options)
+
+
+def _get_option_chain(sym, expiration):
+    return _cached(_opt_cache, ("chain", sym, expiration), lambda: yf.Ticker(sym).option_chain(expiration))
+
 # ─── LIVE PRICE CACHE (Background Thread) ────────────────
-# Stores latest prices; updated every 2 seconds in background
+# Stores latest prices; updated every 2 seconds in background.
+# Writers publish a fresh snapshot object and rebind it in one assignment
+# (atomic under the GIL); snapshots are never mutated afterwards, so
+# readers need no lock.
 live_cache = {
-    "ticker": [],        # [{symbol, price, change, changePct}, ...]
-    "charts": {},        # {symbol: {chart_data, price, change, ...}}
-    "timestamp": "",
+    "ticker": {"stocks": [], "timestamp": ""},   # {stocks: [{symbol, price, change, changePct}, ...], timestamp}
+    "charts": {},        # {symbol: {prices, times, price, change, ..., timestamp}}
     "ticker_symbols": ["AAPL", "TSLA", "GOOGL", "MSFT", "AMZN", "META", "NVDA", "NFLX"],
     "chart_symbol": None,
-    "lock": threading.Lock(),
+    "ticker_cv": threading.Condition(),   # notified when "ticker" is refreshed
+    "chart_cv": threading.Condition(),    # notified when any "charts" entry is refreshed
 }
 
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{sym}"
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+_yahoo = requests.Session()  # keep-alive connection reused by every live refresh
+_yahoo.headers["User-Agent"] = "Mozilla/5.0"
+
+SSE_KEEPALIVE = 30  # seconds an idle stream waits before sending a comment line
+
+
+def _notify(cv_name):
+    cv = live_cache[cv_name]
+    with cv:
+        cv.notify_all()
+
+
+def _quote_endpoint(syms):
+    """Last price and change for every symbol from one call to Yahoo's v7 quote API."""
+    r = _yahoo.get(YAHOO_QUOTE_URL, params={"symbols": ",".join(syms)}, timeout=5)
+    r.raise_for_status()
+    results = []
+    for q in (orjson or json).loads(r.content)["quoteResponse"]["result"]:
+        price = q.get("regularMarketPrice")
+        if price is None:
+            continue
+        results.append({
+            "symbol": q["symbol"],
+            "price": round(price, 2),
+            "change": round(q.get("regularMarketChange") or 0.0, 2),
+            "changePct": round(q.get("regularMarketChangePercent") or 0.0, 2),
+        })
+    return results
+
+
+def _quote_download(syms):
+    """Fallback for when the quote API refuses us (it may demand a crumb): one batched download."""
+    df = yf.download(syms, period="2d", interval="1d", group_by="ticker",
+                     threads=True, progress=False, auto_adjust=False)
+    closes = df.xs("Close", level=1, axis=1).reindex(columns=syms)
+    cur = closes.ffill().iloc[-1].round(2)
+    prev = closes.iloc[-2].round(2) if len(closes) >= 2 else cur
+    prev = prev.fillna(cur)  # single bar → no change
+    chg = (cur - prev).round(2)
+    pct = (chg / prev * 100).round(2)
+    return [{"symbol": s, "price": cur[s], "change": chg[s], "changePct": pct[s]}
+            for s in syms if pd.notna(cur[s])]
+
 
 def _bg_update_ticker():
     """Background thread: refreshes ticker prices every 2 seconds."""
+    quote_api_ok = True
     while True:
         try:
-            results = []
-            for sym in live_cache["ticker_symbols"]:
+            syms = live_cache["ticker_symbols"]
+            results = None
+            if quote_api_ok:
                 try:
-                    t = yf.Ticker(sym)
-                    h = t.history(period="2d")
-                    if len(h) >= 2:
-                        cur = round(h["Close"].iloc[-1], 2)
-                        prev = round(h["Close"].iloc[-2], 2)
-                        chg = round(cur - prev, 2)
-                        pct = round((chg / prev) * 100, 2)
-                    elif len(h) == 1:
-                        cur = round(h["Close"].iloc[-1], 2)
-                        chg = 0
-                        pct = 0
-                    else:
-                        continue
-                    results.append({"symbol": sym, "price": cur, "change": chg, "changePct": pct})
-                except:
-                    continue
-
-            with live_cache["lock"]:
-                live_cache["ticker"] = results
-                live_cache["timestamp"] = datetime.now().strftime("%H:%M:%S")
+                    results = _quote_endpoint(syms)
+                except requests.HTTPError as e:
+                    # 401/403 (missing crumb) won't fix itself; 429/5xx fall back for this tick only
+                    if e.response is not None and e.response.status_code in (401, 403):
+                        quote_api_ok = False
+                except (requests.RequestException, KeyError, TypeError, ValueError):
+                    pass
+            if not results:
+                results = _quote_download(syms)
+            ts = datetime.now().strftime("%H:%M:%S")
+
+            live_cache["ticker"] = {"stocks": results, "timestamp": ts}
+            _notify("ticker_cv")
         except:
             pass
         time.sleep(2)
 
 
+def _fetch_chart(sym, rng, interval):
+    """Intraday bars straight from Yahoo's chart API, skipping yfinance's DataFrame pipeline.
+
+    Returns (times, open, high, low, close) NumPy arrays with empty bars dropped.
+    """
+    r = _yahoo.get(YAHOO_CHART_URL.format(sym=requests.utils.quote(sym, safe="")), params={"range": rng, "interval": interval}, timeout=5)
+    r.raise_for_status()
+    result = (orjson or json).loads(r.content)["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    ohlc = [np.array(quote[k], dtype=np.float64) for k in ("open", "high", "low", "close")]
+    keep = ~np.isnan(ohlc[3])
+
+    # Exchange-local epoch seconds, matching history().index
+    epochs = np.array(result.get("timestamp") or [], dtype=np.int64) + result["meta"].get("gmtoffset", 0)
+    times = _epoch_labels((sym, interval), epochs)
+    return (times[keep], *(col[keep] for col in ohlc))
+
+
+# (key, epochs, labels) from the previous refresh. Only one live chart symbol is
+# tracked at a time, so a single entry suffices and user-supplied symbols can't
+# grow it; rebinding the tuple is atomic, like the live_cache snapshots.
+_chart_labels = (None, None, None)
+
+
+def _epoch_labels(key, epochs):
+    """Format epochs as "YYYY-MM-DD HH:MM", reusing the labels from the last refresh of key.
+
+    Refreshes only append bars, so normally just the new tail gets formatted.
+    """
+    global _chart_labels
+    prev_key, prev_epochs, prev_labels = _chart_labels
+    n = 0
+    if (prev_key == key and len(prev_epochs) <= len(epochs)
+            and np.array_equal(prev_epochs, epochs[:len(prev_epochs)])):
+        n = len(prev_epochs)
+    if n == len(epochs):  # no new bars (or none at all)
+        return prev_labels if n else np.empty(0, dtype="U16")
+    tail = np.char.replace(np.datetime_as_string(epochs[n:].astype("datetime64[s]"), unit="m"), "T", " ")
+    labels = np.concatenate((prev_labels, tail)) if n else tail
+    _chart_labels = (key, epochs, labels)
+    return labels
+
+
+def _get_intraday(sym):
+    """1-minute bars for today, or 5-minute bars over 5 days when today has none."""
+    for rng, interval in (("1d", "1m"), ("5d", "5m")):
+        try:
+            bars = _fetch_chart(sym, rng, interval)
+        except (requests.RequestException, KeyError, IndexError, TypeError, ValueError):
+            # Direct endpoint unavailable — fall back to yfinance
+            h = _get_history(sym, rng, interval)
+            bars = (h.index.strftime("%Y-%m-%d %H:%M").to_numpy(),
+                    *(h[c].to_numpy() for c in ("Open", "High", "Low", "Close")))
+        if len(bars[0]):
+            return bars
+    return bars
+
+
+def _live_snapshot(sym):
+    """Build the live_cache["charts"] entry for a symbol, or None when there is no intraday data."""
+    times, opens, highs, lows, closes = _get_intraday(sym)
+    if not len(times):
+        return None
+
+    cur = round(float(closes[-1]), 2)
+    opn = round(float(opens[0]), 2)
+    chg = round(cur - opn, 2)
+    pct = round((chg / opn) * 100, 2)
+    return {
+        "prices": closes,   # ndarrays; serialized in one pass by app.json
+        "times": times,
+        "price": cur, "open": opn,
+        "change": chg, "changePct": pct,
+        "high": round(float(np.nanmax(highs)), 2),
+        "low": round(float(np.nanmin(lows)), 2),
+        "date": datetime.now().strftime("%b %d, %Y"),
+        "timestamp": datetime.now().strftime("%H:%M:%S"),
+    }
+
+
 def _bg_update_chart():
     """Background thread: refreshes live chart data every 3 seconds."""
     while True:
         sym = live_cache.get("chart_symbol")
         if sym:
             try:
-                t = yf.Ticker(sym)
-                h = t.history(period="1d", interval="1m")
-                if h.empty:
-                    h = t.history(period="5d", interval="5m")
-                if not h.empty:
-                    cur = round(h["Close"].iloc[-1], 2)
-                    opn = round(h["Open"].iloc[0], 2)
-                    chg = round(cur - opn, 2)
-                    pct = round((chg / opn) * 100, 2)
-                    hi = round(h["High"].max(), 2)
-                    lo = round(h["Low"].min(), 2)
-                    today = datetime.now().strftime("%b %d, %Y")
-
-                    with live_cache["lock"]:
-                        live_cache["charts"][sym] = {
-                            "prices": h["Close"].tolist(),
-                            "times": h.index.strftime("%Y-%m-%d %H:%M").tolist(),
-                            "price": cur, "open": opn,
-                            "change": chg, "changePct": pct,
-                            "high": hi, "low": lo,
-                            "date": today,
-                            "timestamp": datetime.now().strftime("%H:%M:%S"),
-                        }
+                snapshot = _live_snapshot(sym)
+                if snapshot:
+                    live_cache["charts"][sym] = snapshot
+                    _notify("chart_cv")
             except:
                 pass
         time.sleep(3)
 
 
-# Start background threads (only once, avoid duplicate with reloader)
+# Start background threads (only once, avoid duplicate with reloader).
+# Under gunicorn each worker imports the app and keeps its own live_cache,
+# so each worker runs its own pair of refresh threads.
 import os
 if os.environ.get("WERKZEUG_RUN_MAIN") == "true" or not app.debug:
     ticker_thread = threading.Thread(target=_bg_update_ticker, daemon=True)
@@ -120,99 +329,38 @@ def get_stock_data():
         return jsonify({"error": "Please provide a stock symbol"}), 400
 
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period)
+        fresh = _bypass()
+        hist = _get_history(symbol, period, fresh=fresh)
 
         if hist.empty:
             return jsonify({"error": f"No data found for '{symbol}'. Check the symbol."}), 404
 
-        info = ticker.info
-
-        # ── Key Metrics ──
-        current_price = round(hist["Close"].iloc[-1], 2)
-        start_price = round(hist["Close"].iloc[0], 2)
-        roi = round(((current_price - start_price) / start_price) * 100, 2)
-        high_52w = round(hist["Close"].max(), 2)
-        low_52w = round(hist["Close"].min(), 2)
-        avg_volume = int(hist["Volume"].mean())
-
-        metrics = {
-            "symbol": symbol,
-            "name": info.get("shortName", symbol),
-            "currentPrice": current_price,
-            "startPrice": start_price,
-            "roi": roi,
-            "high52w": high_52w,
-            "low52w": low_52w,
-            "avgVolume": f"{avg_volume:,}",
-            "marketCap": _format_number(info.get("marketCap", 0)),
-            "pe": info.get("trailingPE", "N/A"),
-            "eps": info.get("trailingEps", "N/A"),
-            "dividend": info.get("dividendYield", 0),
-            "sector": info.get("sector", "N/A"),
-            "industry": info.get("industry", "N/A"),
-            "beta": info.get("beta", "N/A"),
-            "period": period,
-        }
-
-        if metrics["dividend"] and metrics["dividend"] != "N/A":
-            metrics["dividend"] = f"{round(metrics['dividend'] * 100, 2)}%"
-        else:
-            metrics["dividend"] = "N/A"
+        # ── Key Metrics (slow .info fields come from /api/stock/info) ──
+        metrics = _fast_metrics(symbol, hist, period)
 
-        if metrics["pe"] and metrics["pe"] != "N/A":
-            metrics["pe"] = round(float(metrics["pe"]), 2)
+        charts = _cached(_chart_cache, ("stock", symbol, _hist_digest(hist)),
+                         lambda: _stock_charts(hist, symbol), fresh)
 
-        # ── Price Chart (Candlestick) ──
-        price_chart = _build_candlestick(hist, symbol)
-
-        # ── ROI Chart ──
-        roi_chart = _build_roi_chart(hist, symbol)
+        return jsonify({
+            "metrics": metrics,
+            "charts": charts,
+        })
 
-        # ── Volume Chart ──
-        volume_chart = _build_volume_chart(hist, symbol)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # ── Moving Averages Chart ──
-        ma_chart = _build_ma_chart(hist, symbol)
 
-        # ── Strategy Charts (RSI, MACD, Bollinger) ──
-        close = hist["Close"]
-        strat_charts = {}
-
-        if len(hist) >= 14:
-            delta = close.diff()
-            gain = delta.where(delta > 0, 0).rolling(14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            strat_charts["rsi"] = _build_rsi_chart(hist, rsi, symbol)
-
-        if len(hist) >= 26:
-            ema12 = close.ewm(span=12, adjust=False).mean()
-            ema26 = close.ewm(span=26, adjust=False).mean()
-            macd_line = ema12 - ema26
-            signal_line = macd_line.ewm(span=9, adjust=False).mean()
-            macd_hist = macd_line - signal_line
-            strat_charts["macd"] = _build_macd_chart(hist, macd_line, signal_line, macd_hist, symbol)
-
-        if len(hist) >= 20:
-            sma20 = close.rolling(20).mean()
-            std20 = close.rolling(20).std()
-            upper_band = sma20 + (std20 * 2)
-            lower_band = sma20 - (std20 * 2)
-            strat_charts["bollinger"] = _build_bollinger_chart(hist, sma20, upper_band, lower_band, symbol)
+@app.route("/api/stock/info", methods=["POST"])
+def get_stock_info():
+    """Return the slow-changing profile fields (name, sector, P/E, ...) for a ticker."""
+    data = request.json
+    symbol = data.get("symbol", "").upper().strip()
 
-        return jsonify({
-            "metrics": metrics,
-            "charts": {
-                "price": price_chart,
-                "roi": roi_chart,
-                "volume": volume_chart,
-                "ma": ma_chart,
-                **strat_charts,
-            },
-        })
+    if not symbol:
+        return jsonify({"error": "Please provide a stock symbol"}), 400
 
+    try:
+        return jsonify(_enrich_metrics(symbol))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -227,8 +375,7 @@ def get_news_sentiment():
         return jsonify({"error": "Please provide a stock symbol"}), 400
 
     try:
-        ticker = yf.Ticker(symbol)
-        news_items = ticker.news if hasattr(ticker, "news") else []
+        news_items = _get_news(symbol)
 
         results = []
         positive = 0
@@ -247,8 +394,7 @@ def get_news_sentiment():
                 pub_date = "N/A"
 
             # Sentiment analysis on headline
-            scores = analyzer.polarity_scores(title)
-            compound = scores["compound"]
+            compound = _sentiment(title)
 
             if compound >= 0.05:
                 sentiment = "Positive"
@@ -317,8 +463,7 @@ def chat():
 @app.route("/api/live", methods=["POST"])
 def get_live_price():
     """Return cached live prices instantly."""
-    with live_cache["lock"]:
-        return jsonify({"stocks": live_cache["ticker"], "timestamp": live_cache["timestamp"]})
+    return jsonify(live_cache["ticker"])
 
 
 @app.route("/api/livechart", methods=["POST"])
@@ -332,37 +477,16 @@ def get_live_chart():
     # Tell background thread to track this symbol
     live_cache["chart_symbol"] = symbol
 
-    with live_cache["lock"]:
-        cached = live_cache["charts"].get(symbol)
+    cached = live_cache["charts"].get(symbol)
 
     if not cached:
         # First request — fetch directly, cache will take over after
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="1d", interval="1m")
-            if hist.empty:
-                hist = ticker.history(period="5d", interval="5m")
-            if hist.empty:
+            cached = _live_snapshot(symbol)
+            if not cached:
                 return jsonify({"error": f"No intraday data for '{symbol}'."}), 404
-
-            cur = round(hist["Close"].iloc[-1], 2)
-            opn = round(hist["Open"].iloc[0], 2)
-            chg = round(cur - opn, 2)
-            pct = round((chg / opn) * 100, 2)
-            today = datetime.now().strftime("%b %d, %Y")
-
-            cached = {
-                "prices": hist["Close"].tolist(),
-                "times": hist.index.strftime("%Y-%m-%d %H:%M").tolist(),
-                "price": cur, "open": opn,
-                "change": chg, "changePct": pct,
-                "high": round(hist["High"].max(), 2),
-                "low": round(hist["Low"].min(), 2),
-                "date": today,
-                "timestamp": datetime.now().strftime("%H:%M:%S"),
-            }
-            with live_cache["lock"]:
-                live_cache["charts"][symbol] = cached
+            live_cache["charts"][symbol] = cached
+            _notify("chart_cv")
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -371,21 +495,16 @@ def get_live_chart():
     fill_color = "rgba(0,200,83,0.1)" if cached["change"] >= 0 else "rgba(255,23,68,0.1)"
     sign = "+" if cached["change"] >= 0 else ""
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=cached["times"], y=cached["prices"], mode="lines",
-        line=dict(color=line_color, width=2.5),
-        fill="tozeroy", fillcolor=fill_color, name="Price",
-    ))
-    fig.add_hline(y=cached["open"], line_dash="dash", line_color="#64748b", opacity=0.5,
-                   annotation_text=f"Open ${cached['open']}")
-    fig.update_layout(
-        title=f"{symbol} Live Intraday ({cached.get('date', 'Today')}) — ${cached['price']} ({sign}{cached['changePct']}%)",
-        xaxis_title="Time", yaxis_title="Price (USD)",
-        template="plotly_dark", height=450,
-        margin=dict(l=40, r=40, t=50, b=40),
+    chart = _fig(
+        f"{symbol} Live Intraday ({cached.get('date', 'Today')}) — ${cached['price']} ({sign}{cached['changePct']}%)",
+        "Time", "Price (USD)", [{
+            "type": "scatter", "x": cached["times"], "y": cached["prices"], "mode": "lines", "name": "Price",
+            "line": {"color": line_color, "width": 2.5},
+            "fill": "tozeroy", "fillcolor": fill_color,
+        }], height=450,
+        shapes=[_hline(cached["open"], "#64748b", "dash", 0.5)],
+        annotations=[_hline_label(cached["open"], f"Open ${cached['open']}")],
     )
-    chart = json.loads(plotly.io.to_json(fig))
 
     return jsonify({
         "chart": chart,
@@ -401,15 +520,19 @@ def stream_ticker():
     """SSE: Push live ticker data to client in real-time."""
     def generate():
         last_ts = ""
+        cv = live_cache["ticker_cv"]
         while True:
-            with live_cache["lock"]:
-                ts = live_cache["timestamp"]
-                data = live_cache["ticker"]
-            if ts != last_ts and data:
-                last_ts = ts
-                payload = json.dumps({"stocks": data, "timestamp": ts})
-                yield f"data: {payload}\n\n"
-            time.sleep(1)
+            snapshot = live_cache["ticker"]
+            if snapshot["timestamp"] != last_ts:
+                last_ts = snapshot["timestamp"]
+                if snapshot["stocks"]:
+                    payload = app.json.dumps(snapshot)
+                    yield f"data: {payload}\n\n"
+            # Sleep until the background thread publishes a new snapshot
+            with cv:
+                fresh = cv.wait_for(lambda: live_cache["ticker"]["timestamp"] != last_ts, timeout=SSE_KEEPALIVE)
+            if not fresh:
+                yield ": keep-alive\n\n"
     return Response(stream_with_context(generate()), mimetype="text/event-stream",
                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
@@ -420,14 +543,17 @@ def stream_chart(symbol):
     symbol = symbol.upper().strip()
     live_cache["chart_symbol"] = symbol
 
+    def _chart_ts():
+        return live_cache["charts"].get(symbol, {}).get("timestamp", "")
+
     def generate():
         last_ts = ""
+        cv = live_cache["chart_cv"]
         while True:
-            with live_cache["lock"]:
-                cached = live_cache["charts"].get(symbol)
+            cached = live_cache["charts"].get(symbol)
             if cached and cached["timestamp"] != last_ts:
                 last_ts = cached["timestamp"]
-                payload = json.dumps({
+                payload = app.json.dumps({
                     "times": cached["times"],
                     "prices": cached["prices"],
                     "price": cached["price"], "open": cached["open"],
@@ -437,7 +563,10 @@ def stream_chart(symbol):
                     "timestamp": cached["timestamp"],
                 })
                 yield f"data: {payload}\n\n"
-            time.sleep(1)
+            with cv:
+                fresh = cv.wait_for(lambda: _chart_ts() != last_ts, timeout=SSE_KEEPALIVE)
+            if not fresh:
+                yield ": keep-alive\n\n"
     return Response(stream_with_context(generate()), mimetype="text/event-stream",
                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
@@ -452,22 +581,22 @@ def get_strategy():
         return jsonify({"error": "Please provide a stock symbol"}), 400
 
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1y")
+        fresh = _bypass()
+        hist = _get_history(symbol, "1y", fresh=fresh)
 
         if hist.empty or len(hist) < 30:
             return jsonify({"error": f"Not enough data for '{symbol}' to calculate strategies."}), 404
 
         close = hist["Close"]
+        close_arr = close.to_numpy(np.float64)
         current_price = round(close.iloc[-1], 2)
 
-        # ── RSI (14-period) ──
-        delta = close.diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = round(rsi.iloc[-1], 2)
+        # ── RSI, MACD, Bollinger, MA50/200 in one pass ──
+        (rsi, macd_line, signal_line, macd_hist,
+         sma20, upper_band, lower_band, ma50, ma200) = compute_all(close_arr)
+
+        # ── RSI (14-period, Wilder) ──
+        current_rsi = round(rsi[-1], 2)
 
         if current_rsi > 70:
             rsi_signal = "Overbought — Consider Selling 🔴"
@@ -477,15 +606,9 @@ def get_strategy():
             rsi_signal = "Neutral Range 🟡"
 
         # ── MACD ──
-        ema12 = close.ewm(span=12, adjust=False).mean()
-        ema26 = close.ewm(span=26, adjust=False).mean()
-        macd_line = ema12 - ema26
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        macd_hist = macd_line - signal_line
-
-        current_macd = round(macd_line.iloc[-1], 4)
-        current_signal = round(signal_line.iloc[-1], 4)
-        current_histogram = round(macd_hist.iloc[-1], 4)
+        current_macd = round(macd_line[-1], 4)
+        current_signal = round(signal_line[-1], 4)
+        current_histogram = round(macd_hist[-1], 4)
 
         if current_macd > current_signal:
             macd_signal = "Bullish Crossover — Buy Signal 🟢"
@@ -493,14 +616,9 @@ def get_strategy():
             macd_signal = "Bearish Crossover — Sell Signal 🔴"
 
         # ── Bollinger Bands (20-period, 2 std) ──
-        sma20 = close.rolling(20).mean()
-        std20 = close.rolling(20).std()
-        upper_band = sma20 + (std20 * 2)
-        lower_band = sma20 - (std20 * 2)
-
-        curr_upper = round(upper_band.iloc[-1], 2)
-        curr_lower = round(lower_band.iloc[-1], 2)
-        curr_sma = round(sma20.iloc[-1], 2)
+        curr_upper = round(upper_band[-1], 2)
+        curr_lower = round(lower_band[-1], 2)
+        curr_sma = round(sma20[-1], 2)
 
         if current_price >= curr_upper:
             bb_signal = "Near Upper Band — Potentially Overbought 🔴"
@@ -515,11 +633,10 @@ def get_strategy():
         resistance = round(recent.max(), 2)
 
         # ── Moving Average Crossover ──
-        ma50 = close.rolling(50).mean()
-        ma200 = close.rolling(200).mean() if len(close) >= 200 else None
+        has_ma_cross = not np.isnan(ma50[-1]) and not np.isnan(ma200[-1])
 
-        if ma200 is not None and not ma50.isna().iloc[-1] and not ma200.isna().iloc[-1]:
-            if ma50.iloc[-1] > ma200.iloc[-1]:
+        if has_ma_cross:
+            if ma50[-1] > ma200[-1]:
                 ma_cross_signal = "Golden Cross (MA50 > MA200) — Bullish 🟢"
             else:
                 ma_cross_signal = "Death Cross (MA50 < MA200) — Bearish 🔴"
@@ -539,8 +656,8 @@ def get_strategy():
         if current_price <= curr_lower: buy_signals += 1
         elif current_price >= curr_upper: sell_signals += 1
 
-        if ma200 is not None and not ma50.isna().iloc[-1] and not ma200.isna().iloc[-1]:
-            if ma50.iloc[-1] > ma200.iloc[-1]: buy_signals += 1
+        if has_ma_cross:
+            if ma50[-1] > ma200[-1]: buy_signals += 1
             else: sell_signals += 1
 
         if buy_signals > sell_signals:
@@ -551,9 +668,15 @@ def get_strategy():
             overall = f"HOLD — Signals are mixed 🟡"
 
         # ── Charts ──
-        rsi_chart = _build_rsi_chart(hist, rsi, symbol)
-        macd_chart = _build_macd_chart(hist, macd_line, signal_line, macd_hist, symbol)
-        bb_chart = _build_bollinger_chart(hist, sma20, upper_band, lower_band, symbol)
+        def build_charts():
+            ctx = HistContext.from_hist(hist)
+            return {
+                "rsi": _build_rsi_chart(ctx, rsi, symbol),
+                "macd": _build_macd_chart(ctx, macd_line, signal_line, macd_hist, symbol),
+                "bollinger": _build_bollinger_chart(ctx, sma20, upper_band, lower_band, symbol),
+            }
+
+        charts = _cached(_chart_cache, ("strategy", symbol, _hist_digest(hist)), build_charts, fresh)
 
         return jsonify({
             "symbol": symbol,
@@ -577,11 +700,7 @@ def get_strategy():
                 "maCrossover": ma_cross_signal,
                 "overall": overall,
             },
-            "charts": {
-                "rsi": rsi_chart,
-                "macd": macd_chart,
-                "bollinger": bb_chart,
-            },
+            "charts": charts,
         })
 
     except Exception as e:
@@ -598,8 +717,7 @@ def get_options():
         return jsonify({"error": "Please provide a stock symbol"}), 400
 
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1y")
+        hist = _get_history(symbol, "1y")
         if hist.empty:
             return jsonify({"error": f"No data found for '{symbol}'."}), 404
 
@@ -607,7 +725,7 @@ def get_options():
 
         # Get options expiration dates
         try:
-            exp_dates = ticker.options
+            exp_dates = _get_option_dates(symbol)
         except Exception:
             exp_dates = []
 
@@ -623,7 +741,7 @@ def get_options():
                 best_exp = d
                 break
 
-        chain = ticker.option_chain(best_exp)
+        chain = _get_option_chain(symbol, best_exp)
         calls = chain.calls
         puts = chain.puts
 
@@ -647,8 +765,8 @@ def get_options():
             pc_signal = "Neutral Put/Call Ratio 🟡"
 
         # ── Implied Volatility ──
-        atm_calls = calls.iloc[(calls["strike"] - current_price).abs().argsort()[:3]]
-        atm_puts = puts.iloc[(puts["strike"] - current_price).abs().argsort()[:3]]
+        atm_calls = calls.iloc[_nearest_strikes(calls, current_price, 3)]
+        atm_puts = puts.iloc[_nearest_strikes(puts, current_price, 3)]
         avg_call_iv = round(atm_calls["impliedVolatility"].mean() * 100, 2) if "impliedVolatility" in atm_calls.columns else 0
         avg_put_iv = round(atm_puts["impliedVolatility"].mean() * 100, 2) if "impliedVolatility" in atm_puts.columns else 0
         avg_iv = round((avg_call_iv + avg_put_iv) / 2, 2)
@@ -662,26 +780,22 @@ def get_options():
 
         # ── Iron Condor Setup ──
         # Find strikes: sell OTM put & call, buy further OTM for protection
-        otm_puts = puts[puts["strike"] < current_price].sort_values("strike", ascending=False)
-        otm_calls = calls[calls["strike"] > current_price].sort_values("strike", ascending=True)
+        put_strikes, put_prems = _otm_legs(puts, current_price, below=True)
+        call_strikes, call_prems = _otm_legs(calls, current_price, below=False)
 
         ic_result = {}
-        if len(otm_puts) >= 2 and len(otm_calls) >= 2:
-            sell_put = otm_puts.iloc[1]   # slightly OTM put (sell)
-            buy_put = otm_puts.iloc[3] if len(otm_puts) > 3 else otm_puts.iloc[-1]  # further OTM (buy)
-            sell_call = otm_calls.iloc[1]  # slightly OTM call (sell)
-            buy_call = otm_calls.iloc[3] if len(otm_calls) > 3 else otm_calls.iloc[-1]  # further OTM (buy)
-
-            sell_put_strike = round(float(sell_put["strike"]), 2)
-            buy_put_strike = round(float(buy_put["strike"]), 2)
-            sell_call_strike = round(float(sell_call["strike"]), 2)
-            buy_call_strike = round(float(buy_call["strike"]), 2)
+        if len(put_strikes) >= 2 and len(call_strikes) >= 2:
+            # [1] = slightly OTM (sell); [-1] = 4th-nearest or furthest available (buy)
+            sell_put_strike = round(float(put_strikes[1]), 2)
+            buy_put_strike = round(float(put_strikes[-1]), 2)
+            sell_call_strike = round(float(call_strikes[1]), 2)
+            buy_call_strike = round(float(call_strikes[-1]), 2)
 
             # Premium collected
-            sp_prem = round(float(sell_put.get("lastPrice", 0)), 2)
-            bp_prem = round(float(buy_put.get("lastPrice", 0)), 2)
-            sc_prem = round(float(sell_call.get("lastPrice", 0)), 2)
-            bc_prem = round(float(buy_call.get("lastPrice", 0)), 2)
+            sp_prem = round(float(put_prems[1]), 2)
+            bp_prem = round(float(put_prems[-1]), 2)
+            sc_prem = round(float(call_prems[1]), 2)
+            bc_prem = round(float(call_prems[-1]), 2)
 
             net_credit = round((sp_prem + sc_prem) - (bp_prem + bc_prem), 2)
             put_width = round(sell_put_strike - buy_put_strike, 2)
@@ -748,172 +862,200 @@ def get_options():
 
 # ─── CHART BUILDERS ──────────────────────────────────────
 
-def _build_candlestick(hist, symbol):
-    fig = go.Figure(data=[go.Candlestick(
-        x=hist.index.strftime("%Y-%m-%d").tolist(),
-        open=hist["Open"].tolist(),
-        high=hist["High"].tolist(),
-        low=hist["Low"].tolist(),
-        close=hist["Close"].tolist(),
-        increasing_line_color="#00c853",
-        decreasing_line_color="#ff1744",
-    )])
-    fig.update_layout(
-        title=f"{symbol} Price Chart",
-        xaxis_title="Date", yaxis_title="Price (USD)",
-        template="plotly_dark",
-        height=450,
-        margin=dict(l=40, r=40, t=50, b=40),
-        xaxis_rangeslider_visible=False,
-    )
-    return json.loads(plotly.io.to_json(fig))
-
-
-def _build_roi_chart(hist, symbol):
-    start = hist["Close"].iloc[0]
-    roi_series = ((hist["Close"] - start) / start * 100).tolist()
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
-
-    colors = ["#00c853" if v >= 0 else "#ff1744" for v in roi_series]
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=dates, y=roi_series, mode="lines",
-        line=dict(color="#00bcd4", width=2),
-        fill="tozeroy",
-        fillcolor="rgba(0,188,212,0.15)",
-        name="ROI %",
-    ))
-    fig.add_hline(y=0, line_dash="dash", line_color="white", opacity=0.4)
-    fig.update_layout(
-        title=f"{symbol} ROI Over Time (%)",
-        xaxis_title="Date", yaxis_title="ROI (%)",
-        template="plotly_dark",
-        height=400,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
-
-
-def _build_volume_chart(hist, symbol):
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
-    volumes = hist["Volume"].tolist()
-
-    fig = go.Figure(data=[go.Bar(
-        x=dates, y=volumes,
-        marker_color="#7c4dff",
-        opacity=0.7,
-    )])
-    fig.update_layout(
-        title=f"{symbol} Trading Volume",
-        xaxis_title="Date", yaxis_title="Volume",
-        template="plotly_dark",
-        height=350,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
+# Plain-dict figures skip plotly's per-property validation; "plotly_dark" is
+# expanded once here since plotly.js only understands the template object.
+_DARK_TEMPLATE = plotly.io.templates["plotly_dark"].to_plotly_json()
+
 
+def _hline(y, color, dash, opacity):
+    """Full-width horizontal reference line (layout shape), like fig.add_hline."""
+    return {"type": "line", "xref": "x domain", "x0": 0, "x1": 1, "yref": "y", "y0": y, "y1": y,
+            "line": {"color": color, "dash": dash}, "opacity": opacity}
 
-def _build_ma_chart(hist, symbol):
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
-    close = hist["Close"].tolist()
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=close, name="Close", line=dict(color="#ffffff", width=1.5)))
+def _vline(x, color, dash, opacity):
+    """Full-height vertical reference line (layout shape), like fig.add_vline."""
+    return {"type": "line", "xref": "x", "x0": x, "x1": x, "yref": "y domain", "y0": 0, "y1": 1,
+            "line": {"color": color, "dash": dash}, "opacity": opacity}
+
 
-    if len(hist) >= 20:
-        ma20 = hist["Close"].rolling(20).mean().tolist()
-        fig.add_trace(go.Scatter(x=dates, y=ma20, name="MA 20", line=dict(color="#ffeb3b", width=1.5, dash="dot")))
+def _hline_label(y, text):
+    return {"text": text, "showarrow": False, "xref": "x domain", "x": 1, "xanchor": "right",
+            "yref": "y", "y": y, "yanchor": "bottom"}
 
-    if len(hist) >= 50:
-        ma50 = hist["Close"].rolling(50).mean().tolist()
-        fig.add_trace(go.Scatter(x=dates, y=ma50, name="MA 50", line=dict(color="#00bcd4", width=1.5, dash="dash")))
 
-    if len(hist) >= 200:
-        ma200 = hist["Close"].rolling(200).mean().tolist()
-        fig.add_trace(go.Scatter(x=dates, y=ma200, name="MA 200", line=dict(color="#ff9800", width=2)))
+def _vline_label(x, text):
+    return {"text": text, "showarrow": False, "xref": "x", "x": x, "xanchor": "left",
+            "yref": "y domain", "y": 1, "yanchor": "top"}
 
-    fig.update_layout(
-        title=f"{symbol} Moving Averages",
-        xaxis_title="Date", yaxis_title="Price (USD)",
-        template="plotly_dark",
-        height=400,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
-
-
-def _build_rsi_chart(hist, rsi, symbol):
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
-    rsi_vals = rsi.tolist()
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=rsi_vals, name="RSI", line=dict(color="#00bcd4", width=2)))
-    fig.add_hline(y=70, line_dash="dash", line_color="#ff1744", opacity=0.6, annotation_text="Overbought (70)")
-    fig.add_hline(y=30, line_dash="dash", line_color="#00c853", opacity=0.6, annotation_text="Oversold (30)")
-    fig.add_hrect(y0=30, y1=70, fillcolor="rgba(255,255,255,0.03)", line_width=0)
-    fig.update_layout(
-        title=f"{symbol} RSI (14-Period)",
-        xaxis_title="Date", yaxis_title="RSI",
-        yaxis=dict(range=[0, 100]),
-        template="plotly_dark", height=380,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
 
+@dataclass(slots=True)
+class HistContext:
+    """One history frame's columns as flat arrays plus ISO date labels, shared by every chart builder."""
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    dates: np.ndarray
 
-def _build_macd_chart(hist, macd_line, signal_line, macd_hist, symbol):
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
+    @classmethod
+    def from_hist(cls, hist):
+        # Under pandas 3 these are read-only views of the cached frame; keep them
+        # that way (cached chart dicts share them). indicators._warmup compiles
+        # the read-only kernel variants, so ctx.close doesn't JIT on first use.
+        return cls(
+            open=hist["Open"].to_numpy(np.float64),
+            high=hist["High"].to_numpy(np.float64),
+            low=hist["Low"].to_numpy(np.float64),
+            close=hist["Close"].to_numpy(np.float64),
+            volume=hist["Volume"].to_numpy(),
+            dates=hist.index.strftime("%Y-%m-%d").to_numpy(),
+        )
 
-    colors = ["#00c853" if v >= 0 else "#ff1744" for v in macd_hist.tolist()]
 
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=dates, y=macd_hist.tolist(), name="Histogram", marker_color=colors, opacity=0.5))
-    fig.add_trace(go.Scatter(x=dates, y=macd_line.tolist(), name="MACD", line=dict(color="#00bcd4", width=2)))
-    fig.add_trace(go.Scatter(x=dates, y=signal_line.tolist(), name="Signal", line=dict(color="#ff9800", width=2)))
-    fig.update_layout(
-        title=f"{symbol} MACD",
-        xaxis_title="Date", yaxis_title="Value",
-        template="plotly_dark", height=380,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
-
-
-def _build_bollinger_chart(hist, sma20, upper_band, lower_band, symbol):
-    dates = hist.index.strftime("%Y-%m-%d").tolist()
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=upper_band.tolist(), name="Upper Band", line=dict(color="#ff1744", width=1, dash="dot")))
-    fig.add_trace(go.Scatter(x=dates, y=lower_band.tolist(), name="Lower Band", line=dict(color="#00c853", width=1, dash="dot"), fill="tonexty", fillcolor="rgba(255,255,255,0.03)"))
-    fig.add_trace(go.Scatter(x=dates, y=sma20.tolist(), name="SMA 20", line=dict(color="#ffc107", width=1.5)))
-    fig.add_trace(go.Scatter(x=dates, y=hist["Close"].tolist(), name="Close", line=dict(color="#ffffff", width=2)))
-    fig.update_layout(
-        title=f"{symbol} Bollinger Bands",
-        xaxis_title="Date", yaxis_title="Price (USD)",
-        template="plotly_dark", height=400,
-        margin=dict(l=40, r=40, t=50, b=40),
+def _stock_charts(hist, symbol):
+    """Every /api/stock chart for these bars."""
+    ctx = HistContext.from_hist(hist)
+
+    # ── Price, ROI, Volume, Moving Averages ──
+    charts = {
+        "price": _build_candlestick(ctx, symbol),
+        "roi": _build_roi_chart(ctx, symbol),
+        "volume": _build_volume_chart(ctx, symbol),
+        "ma": _build_ma_chart(ctx, symbol),
+    }
+
+    # ── Strategy Charts (RSI, MACD, Bollinger) ──
+    n = len(ctx.close)
+
+    if n >= 14:
+        charts["rsi"] = _build_rsi_chart(ctx, rsi_nb(ctx.close), symbol)
+
+    if n >= 26:
+        charts["macd"] = _build_macd_chart(ctx, *macd_nb(ctx.close), symbol)
+
+    if n >= 20:
+        charts["bollinger"] = _build_bollinger_chart(ctx, *bollinger_nb(ctx.close), symbol)
+
+    return charts
+
+
+def _fig(title, x_title, y_title, traces, height=400, **layout):
+    """Plain-dict figure on the shared dark theme; extra layout keys are merged over the defaults."""
+    return {"data": list(traces), "layout": {
+        "title": {"text": title},
+        "xaxis": {"title": {"text": x_title}},
+        "yaxis": {"title": {"text": y_title}},
+        "template": _DARK_TEMPLATE,
+        "height": height,
+        "margin": {"l": 40, "r": 40, "t": 50, "b": 40},
+        **layout,
+    }}
+
+
+def _build_candlestick(ctx, symbol):
+    return _fig(f"{symbol} Price Chart", "Date", "Price (USD)", [{
+        "type": "candlestick",
+        "x": ctx.dates,
+        "open": ctx.open,
+        "high": ctx.high,
+        "low": ctx.low,
+        "close": ctx.close,
+        "increasing": {"line": {"color": "#00c853"}},
+        "decreasing": {"line": {"color": "#ff1744"}},
+    }], height=450, xaxis={"title": {"text": "Date"}, "rangeslider": {"visible": False}})
+
+
+def _build_roi_chart(ctx, symbol):
+    close = ctx.close
+    roi_series = (close - close[0]) / close[0] * 100
+
+    return _fig(f"{symbol} ROI Over Time (%)", "Date", "ROI (%)", [{
+        "type": "scatter", "x": ctx.dates, "y": roi_series, "mode": "lines", "name": "ROI %",
+        "line": {"color": "#00bcd4", "width": 2},
+        "fill": "tozeroy", "fillcolor": "rgba(0,188,212,0.15)",
+    }], shapes=[_hline(0, "white", "dash", 0.4)])
+
+
+def _build_volume_chart(ctx, symbol):
+    return _fig(f"{symbol} Trading Volume", "Date", "Volume", [
+        {"type": "bar", "x": ctx.dates, "y": ctx.volume, "marker": {"color": "#7c4dff"}, "opacity": 0.7},
+    ], height=350)
+
+
+def _build_ma_chart(ctx, symbol):
+    close, dates = ctx.close, ctx.dates
+
+    traces = [{"type": "scatter", "x": dates, "y": close, "name": "Close",
+               "line": {"color": "#ffffff", "width": 1.5}}]
+
+    if len(close) >= 20:
+        traces.append({"type": "scatter", "x": dates, "y": rolling_mean_std(close, 20)[0], "name": "MA 20",
+                       "line": {"color": "#ffeb3b", "width": 1.5, "dash": "dot"}})
+
+    if len(close) >= 50:
+        traces.append({"type": "scatter", "x": dates, "y": rolling_mean_std(close, 50)[0], "name": "MA 50",
+                       "line": {"color": "#00bcd4", "width": 1.5, "dash": "dash"}})
+
+    if len(close) >= 200:
+        traces.append({"type": "scatter", "x": dates, "y": rolling_mean_std(close, 200)[0], "name": "MA 200",
+                       "line": {"color": "#ff9800", "width": 2}})
+
+    return _fig(f"{symbol} Moving Averages", "Date", "Price (USD)", traces)
+
+
+def _build_rsi_chart(ctx, rsi, symbol):
+    return _fig(f"{symbol} RSI (14-Period)", "Date", "RSI", [
+        {"type": "scatter", "x": ctx.dates, "y": rsi, "name": "RSI", "line": {"color": "#00bcd4", "width": 2}},
+    ], height=380,
+        yaxis={"title": {"text": "RSI"}, "range": [0, 100]},
+        shapes=[
+            _hline(70, "#ff1744", "dash", 0.6),
+            _hline(30, "#00c853", "dash", 0.6),
+            {"type": "rect", "xref": "x domain", "x0": 0, "x1": 1, "yref": "y", "y0": 30, "y1": 70,
+             "fillcolor": "rgba(255,255,255,0.03)", "line": {"width": 0}},
+        ],
+        annotations=[_hline_label(70, "Overbought (70)"), _hline_label(30, "Oversold (30)")],
     )
-    return json.loads(plotly.io.to_json(fig))
+
+
+def _build_macd_chart(ctx, macd_line, signal_line, macd_hist, symbol):
+    dates = ctx.dates
+    colors = np.where(macd_hist >= 0, "#00c853", "#ff1744")
+
+    return _fig(f"{symbol} MACD", "Date", "Value", [
+        {"type": "bar", "x": dates, "y": macd_hist, "name": "Histogram", "marker": {"color": colors}, "opacity": 0.5},
+        {"type": "scatter", "x": dates, "y": macd_line, "name": "MACD", "line": {"color": "#00bcd4", "width": 2}},
+        {"type": "scatter", "x": dates, "y": signal_line, "name": "Signal", "line": {"color": "#ff9800", "width": 2}},
+    ], height=380)
+
+
+def _build_bollinger_chart(ctx, sma20, upper_band, lower_band, symbol):
+    dates = ctx.dates
+    return _fig(f"{symbol} Bollinger Bands", "Date", "Price (USD)", [
+        {"type": "scatter", "x": dates, "y": upper_band, "name": "Upper Band",
+         "line": {"color": "#ff1744", "width": 1, "dash": "dot"}},
+        {"type": "scatter", "x": dates, "y": lower_band, "name": "Lower Band",
+         "line": {"color": "#00c853", "width": 1, "dash": "dot"},
+         "fill": "tonexty", "fillcolor": "rgba(255,255,255,0.03)"},
+        {"type": "scatter", "x": dates, "y": sma20, "name": "SMA 20", "line": {"color": "#ffc107", "width": 1.5}},
+        {"type": "scatter", "x": dates, "y": ctx.close, "name": "Close",
+         "line": {"color": "#ffffff", "width": 2}},
+    ])
 
 
 def _build_putcall_chart(calls, puts, symbol, expiration):
     # Group by strike and show Open Interest for puts vs calls
-    call_strikes = calls["strike"].tolist()
-    call_oi = calls["openInterest"].fillna(0).tolist() if "openInterest" in calls.columns else []
-    put_strikes = puts["strike"].tolist()
-    put_oi = puts["openInterest"].fillna(0).tolist() if "openInterest" in puts.columns else []
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=call_strikes, y=call_oi, name="Call OI", marker_color="#00c853", opacity=0.7))
-    fig.add_trace(go.Bar(x=put_strikes, y=put_oi, name="Put OI", marker_color="#ff1744", opacity=0.7))
-    fig.update_layout(
-        title=f"{symbol} Put/Call Open Interest — Exp: {expiration}",
-        xaxis_title="Strike Price", yaxis_title="Open Interest",
-        barmode="overlay", template="plotly_dark", height=400,
-        margin=dict(l=40, r=40, t=50, b=40),
-    )
-    return json.loads(plotly.io.to_json(fig))
+    call_oi = calls.get("openInterest")
+    put_oi = puts.get("openInterest")
+    call_oi = call_oi.fillna(0).to_numpy() if call_oi is not None else np.empty(0)
+    put_oi = put_oi.fillna(0).to_numpy() if put_oi is not None else np.empty(0)
+
+    return _fig(f"{symbol} Put/Call Open Interest — Exp: {expiration}", "Strike Price", "Open Interest", [
+        {"type": "bar", "x": calls["strike"].to_numpy(), "y": call_oi, "name": "Call OI", "marker": {"color": "#00c853"}, "opacity": 0.7},
+        {"type": "bar", "x": puts["strike"].to_numpy(), "y": put_oi, "name": "Put OI", "marker": {"color": "#ff1744"}, "opacity": 0.7},
+    ], barmode="overlay")
 
 
 def _build_iron_condor_chart(current_price, ic, symbol, expiration):
@@ -925,175 +1067,272 @@ def _build_iron_condor_chart(current_price, ic, symbol, expiration):
     sc = ic["sellCall"]
     bc = ic["buyCall"]
     credit = ic["netCredit"]
-    max_loss_put = round(sp - bp - credit, 2)
-    max_loss_call = round(bc - sc - credit, 2)
 
-    # Build payoff diagram
-    import numpy as np
-    prices = np.linspace(bp * 0.9, bc * 1.1, 300)
-    payoff = []
-    for p in prices:
-        # Long put (buy put)
-        lp = max(bp - p, 0)
-        # Short put (sell put)
-        spt = -max(sp - p, 0)
-        # Short call (sell call)
-        sct = -max(p - sc, 0)
-        # Long call (buy call)
-        lc = max(p - bc, 0)
-        total = round(lp + spt + sct + lc + credit, 2)
-        payoff.append(total)
-
-    colors = ["#00c853" if v >= 0 else "#ff1744" for v in payoff]
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=prices.tolist(), y=payoff, mode="lines",
-        line=dict(color="#00bcd4", width=2.5),
-        fill="tozeroy",
-        fillcolor="rgba(0,188,212,0.1)",
-        name="Payoff",
-    ))
-    fig.add_hline(y=0, line_dash="dash", line_color="#64748b", opacity=0.5)
-    fig.add_vline(x=current_price, line_dash="dash", line_color="#ffc107", opacity=0.7,
-                   annotation_text=f"Current ${current_price}")
-    fig.add_vline(x=sp, line_dash="dot", line_color="#ff1744", opacity=0.4,
-                   annotation_text=f"Sell Put ${sp}")
-    fig.add_vline(x=sc, line_dash="dot", line_color="#00c853", opacity=0.4,
-                   annotation_text=f"Sell Call ${sc}")
-    fig.update_layout(
-        title=f"{symbol} Iron Condor Payoff — Exp: {expiration} | Credit: ${credit}",
-        xaxis_title="Stock Price at Expiry", yaxis_title="Profit / Loss ($)",
-        template="plotly_dark", height=420,
-        margin=dict(l=40, r=40, t=60, b=40),
+    prices, payoff = _ic_payoff(bp, sp, sc, bc, credit)
+
+    return _fig(f"{symbol} Iron Condor Payoff — Exp: {expiration} | Credit: ${credit}",
+                "Stock Price at Expiry", "Profit / Loss ($)", [{
+        "type": "scatter", "x": prices, "y": payoff, "mode": "lines", "name": "Payoff",
+        "line": {"color": "#00bcd4", "width": 2.5},
+        "fill": "tozeroy", "fillcolor": "rgba(0,188,212,0.1)",
+    }], height=420,
+        margin={"l": 40, "r": 40, "t": 60, "b": 40},
+        shapes=[
+            _hline(0, "#64748b", "dash", 0.5),
+            _vline(current_price, "#ffc107", "dash", 0.7),
+            _vline(sp, "#ff1744", "dot", 0.4),
+            _vline(sc, "#00c853", "dot", 0.4),
+        ],
+        annotations=[
+            _vline_label(current_price, f"Current ${current_price}"),
+            _vline_label(sp, f"Sell Put ${sp}"),
+            _vline_label(sc, f"Sell Call ${sc}"),
+        ],
     )
-    return json.loads(plotly.io.to_json(fig))
+
+
+# Everything but the three counts and the title is fixed; shared parts are only read, never mutated
+_SENTIMENT_PIE = {
+    "type": "pie",
+    "labels": ["Positive", "Negative", "Neutral"],
+    "marker": {"colors": ["#00c853", "#ff1744", "#ffc107"]},
+    "hole": 0.45,
+    "textinfo": "label+percent",
+}
+_SENTIMENT_LAYOUT = {
+    "template": _DARK_TEMPLATE,
+    "height": 350,
+    "margin": {"l": 20, "r": 20, "t": 50, "b": 20},
+}
 
 
 def _build_sentiment_chart(pos, neg, neu, symbol):
-    fig = go.Figure(data=[go.Pie(
-        labels=["Positive", "Negative", "Neutral"],
-        values=[pos, neg, neu],
-        marker_colors=["#00c853", "#ff1744", "#ffc107"],
-        hole=0.45,
-        textinfo="label+percent",
-    )])
-    fig.update_layout(
-        title=f"{symbol} News Sentiment",
-        template="plotly_dark",
-        height=350,
-        margin=dict(l=20, r=20, t=50, b=20),
-    )
-    return json.loads(plotly.io.to_json(fig))
+    return {
+        "data": [{**_SENTIMENT_PIE, "values": [pos, neg, neu]}],
+        "layout": {**_SENTIMENT_LAYOUT, "title": {"text": f"{symbol} News Sentiment"}},
+    }
 
 
 # ─── CHATBOT LOGIC ───────────────────────────────────────
 
-def _process_chat(message):
-    msg = message.lower()
-
-    # Try to extract a stock symbol
-    symbol_match = re.search(r'\b([A-Z]{1,5})\b', message)
-    
-    # Greetings
-    if any(w in msg for w in ["hi", "hello", "hey"]):
-        return ("👋 Hello! I'm your Stock Analysis Assistant.\n\n"
-                "You can ask me things like:\n"
-                "• **Analyze AAPL** — Full stock analysis\n"
-                "• **What is the ROI of TSLA?**\n"
-                "• **News for GOOGL** — Sentiment analysis\n"
-                "• **Compare AAPL vs MSFT**\n"
-                "• **What is PE ratio?** — Learn terms\n\n"
-                "Just type a stock symbol or question!")
-
-    # Definitions
-    if "what is roi" in msg or "roi mean" in msg:
-        return ("📊 **ROI (Return on Investment)** measures how much profit or loss "
-                "an investment has generated relative to its cost.\n\n"
-                "Formula: `ROI = ((Current Value - Initial Value) / Initial Value) × 100`\n\n"
-                "Example: If you bought a stock at $100 and it's now $120, your ROI is **20%**.")
-
-    if "what is pe" in msg or "p/e ratio" in msg or "pe ratio" in msg:
-        return ("📊 **P/E Ratio (Price-to-Earnings)** shows how much investors pay per dollar of earnings.\n\n"
-                "• **High P/E (>25)**: Investors expect high growth (could be overvalued)\n"
-                "• **Low P/E (<15)**: Could be undervalued or slow growth\n\n"
-                "It helps compare stocks within the same industry.")
-
-    if "what is eps" in msg or "eps mean" in msg:
-        return ("📊 **EPS (Earnings Per Share)** = Company's profit ÷ number of shares.\n\n"
-                "Higher EPS = more profitable company. "
-                "It's one of the most important metrics for valuing a stock.")
-
-    if "what is market cap" in msg or "market cap mean" in msg:
-        return ("📊 **Market Cap** = Stock Price × Total Shares Outstanding.\n\n"
-                "• **Large Cap (>$10B)**: Stable, lower risk\n"
-                "• **Mid Cap ($2B-$10B)**: Moderate growth & risk\n"
-                "• **Small Cap (<$2B)**: Higher growth potential & risk")
-
-    if "what is beta" in msg or "beta mean" in msg:
-        return ("📊 **Beta** measures a stock's volatility vs the overall market.\n\n"
-                "• **Beta > 1**: More volatile than market\n"
-                "• **Beta = 1**: Moves with market\n"
-                "• **Beta < 1**: Less volatile than market\n\n"
-                "High beta = higher risk but potentially higher returns.")
-
-    if any(w in msg for w in ["futures", "what is futures", "future trading"]):
-        return ("📊 **Futures** are contracts to buy/sell an asset at a future date at a set price.\n\n"
+_CHAT_REPLIES = {
+    "greet": ("👋 Hello! I'm your Stock Analysis Assistant.\n\n"
+              "You can ask me things like:\n"
+              "• **Analyze AAPL** — Full stock analysis\n"
+              "• **What is the ROI of TSLA?**\n"
+              "• **News for GOOGL** — Sentiment analysis\n"
+              "• **Compare AAPL vs MSFT**\n"
+              "• **What is PE ratio?** — Learn terms\n\n"
+              "Just type a stock symbol or question!"),
+    "roi": ("📊 **ROI (Return on Investment)** measures how much profit or loss "
+            "an investment has generated relative to its cost.\n\n"
+            "Formula: `ROI = ((Current Value - Initial Value) / Initial Value) × 100`\n\n"
+            "Example: If you bought a stock at $100 and it's now $120, your ROI is **20%**."),
+    "pe": ("📊 **P/E Ratio (Price-to-Earnings)** shows how much investors pay per dollar of earnings.\n\n"
+           "• **High P/E (>25)**: Investors expect high growth (could be overvalued)\n"
+           "• **Low P/E (<15)**: Could be undervalued or slow growth\n\n"
+           "It helps compare stocks within the same industry."),
+    "eps": ("📊 **EPS (Earnings Per Share)** = Company's profit ÷ number of shares.\n\n"
+            "Higher EPS = more profitable company. "
+            "It's one of the most important metrics for valuing a stock."),
+    "mcap": ("📊 **Market Cap** = Stock Price × Total Shares Outstanding.\n\n"
+             "• **Large Cap (>$10B)**: Stable, lower risk\n"
+             "• **Mid Cap ($2B-$10B)**: Moderate growth & risk\n"
+             "• **Small Cap (<$2B)**: Higher growth potential & risk"),
+    "beta": ("📊 **Beta** measures a stock's volatility vs the overall market.\n\n"
+             "• **Beta > 1**: More volatile than market\n"
+             "• **Beta = 1**: Moves with market\n"
+             "• **Beta < 1**: Less volatile than market\n\n"
+             "High beta = higher risk but potentially higher returns."),
+    "futures": ("📊 **Futures** are contracts to buy/sell an asset at a future date at a set price.\n\n"
                 "• Used for hedging or speculation\n"
                 "• Trade on commodities, indices, currencies\n"
                 "• High leverage = high risk\n"
-                "• Expiry dates matter — must close or roll over positions")
-
-    if any(w in msg for w in ["options", "what is options", "option trading"]):
-        return ("📊 **Options** give you the RIGHT (not obligation) to buy/sell a stock at a set price.\n\n"
+                "• Expiry dates matter — must close or roll over positions"),
+    "options": ("📊 **Options** give you the RIGHT (not obligation) to buy/sell a stock at a set price.\n\n"
                 "• **Call Option**: Right to BUY (bullish bet)\n"
                 "• **Put Option**: Right to SELL (bearish bet)\n"
                 "• **Premium**: The price you pay for the option\n"
                 "• **Strike Price**: The set price\n"
                 "• **Expiry**: When the option expires\n\n"
-                "Options are great for hedging and leveraged bets!")
+                "Options are great for hedging and leveraged bets!"),
+    "help": ("🤖 **Stock Chatbot Commands:**\n\n"
+             "📈 **Analyze a stock**: Type the stock symbol (e.g., AAPL, TSLA)\n"
+             "📰 **News sentiment**: Click 'Analyze News' button\n"
+             "📊 **Learn terms**: Ask 'What is ROI?', 'What is PE ratio?'\n"
+             "🔄 **Change period**: Use the period dropdown\n\n"
+             "I analyze real-time stock data with charts, ROI, and news sentiment!"),
+    "fallback": ("🤔 I didn't quite get that. Try asking:\n\n"
+                 "• **Analyze AAPL** or any stock symbol\n"
+                 "• **What is ROI / PE / EPS / Beta?**\n"
+                 "• **What are options / futures?**\n"
+                 "• Type **help** for all commands"),
+}
+
+# Reply to a bare ticker mention; the only reply with a dynamic part
+_SYMBOL_PROMPT = ("🔍 Looking for **{sym}**? \n\n"
+                  "Type **{sym}** in the search bar above and click **Analyze** "
+                  "to get full analysis with:\n"
+                  "• 📈 Price & Candlestick charts\n"
+                  "• 📊 ROI graph\n"
+                  "• 📉 Volume & Moving Averages\n"
+                  "• 📰 News sentiment analysis\n\n"
+                  "Or click **Analyze News** for sentiment breakdown!")
+
+# reply key → trigger phrases; compiled into one regex with a named group per reply
+_CHAT_INTENTS = {
+    "greet": ("hi", "hello", "hey"),
+    "roi": ("what is roi", "roi mean"),
+    "pe": ("what is pe", "p/e ratio", "pe ratio"),
+    "eps": ("what is eps", "eps mean"),
+    "mcap": ("what is market cap", "market cap mean"),
+    "beta": ("what is beta", "beta mean"),
+    "futures": ("futures", "future trading"),
+    "options": ("options", "option trading"),
+    "help": ("help",),
+}
+# Whole words, any case; longest phrase first within each group so e.g. "options" beats "option"
+_INTENT_RE = re.compile(r"\b(?:" + "|".join(
+    f"(?P<{name}>" + "|".join(map(re.escape, sorted(phrases, key=len, reverse=True))) + ")"
+    for name, phrases in _CHAT_INTENTS.items()
+) + r")\b", re.IGNORECASE)
+_SYMBOL_RE = re.compile(r"\b([A-Z]{1,5})\b")  # bare uppercase ticker, e.g. "AAPL"
 
-    if "help" in msg:
-        return ("🤖 **Stock Chatbot Commands:**\n\n"
-                "📈 **Analyze a stock**: Type the stock symbol (e.g., AAPL, TSLA)\n"
-                "📰 **News sentiment**: Click 'Analyze News' button\n"
-                "📊 **Learn terms**: Ask 'What is ROI?', 'What is PE ratio?'\n"
-                "🔄 **Change period**: Use the period dropdown\n\n"
-                "I analyze real-time stock data with charts, ROI, and news sentiment!")
+
+def _process_chat(message):
+    # Greetings, definitions and help — first keyword in the message wins
+    intent = _INTENT_RE.search(message)
+    if intent:
+        return _CHAT_REPLIES[intent.lastgroup]
 
     # If they mention a symbol, prompt them to use the search
+    symbol_match = _SYMBOL_RE.search(message)
     if symbol_match:
-        sym = symbol_match.group(1)
-        return (f"🔍 Looking for **{sym}**? \n\n"
-                f"Type **{sym}** in the search bar above and click **Analyze** "
-                f"to get full analysis with:\n"
-                f"• 📈 Price & Candlestick charts\n"
-                f"• 📊 ROI graph\n"
-                f"• 📉 Volume & Moving Averages\n"
-                f"• 📰 News sentiment analysis\n\n"
-                f"Or click **Analyze News** for sentiment breakdown!")
-
-    return ("🤔 I didn't quite get that. Try asking:\n\n"
-            "• **Analyze AAPL** or any stock symbol\n"
-            "• **What is ROI / PE / EPS / Beta?**\n"
-            "• **What are options / futures?**\n"
-            "• Type **help** for all commands")
+        return _SYMBOL_PROMPT.format_map({"sym": symbol_match.group(1)})
+
+    return _CHAT_REPLIES["fallback"]
 
 
 # ─── HELPERS ─────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
+def _sentiment(title):
+    """VADER compound score; headlines repeat across requests, so memoize by text."""
+    return analyzer.polarity_scores(title)["compound"]
+
+
+def _otm_legs(chain, price, below):
+    """Strikes and last prices of the (up to) 4 OTM contracts nearest the money, ordered outward.
+
+    Works on the two needed columns as arrays instead of filtering and sorting the whole chain.
+    """
+    strikes = chain["strike"].to_numpy(np.float64)
+    otm = np.flatnonzero(strikes < price if below else strikes > price)
+    rows = otm[np.argsort(-strikes[otm] if below else strikes[otm], kind="stable")[:4]]
+    last = chain.get("lastPrice")
+    premiums = last.to_numpy(np.float64)[rows] if last is not None else np.zeros(len(rows))
+    return strikes[rows], premiums
+
+
+@lru_cache(maxsize=256)
+def _ic_payoff(bp, sp, sc, bc, credit):
+    """Iron condor price grid and P/L at expiry; strikes sit on standard intervals, so memoize.
+
+    The arrays are shared between callers and marked read-only.
+    """
+    prices = np.linspace(bp * 0.9, bc * 1.1, 300)
+    lp = np.maximum(bp - prices, 0.0)     # long put
+    spt = -np.maximum(sp - prices, 0.0)   # short put
+    sct = -np.maximum(prices - sc, 0.0)   # short call
+    lc = np.maximum(prices - bc, 0.0)     # long call
+    payoff = np.round(lp + spt + sct + lc + credit, 2)
+    prices.flags.writeable = False
+    payoff.flags.writeable = False
+    return prices, payoff
+
+
+def _nearest_strikes(chain, price, k):
+    """Row positions of the k strikes closest to price, in no particular order.
+
+    np.argpartition selects in O(N) instead of fully sorting the chain.
+    """
+    dist = np.abs(chain["strike"].to_numpy(np.float64) - price)
+    if len(dist) <= k:
+        return np.arange(len(dist))
+    return np.argpartition(dist, k - 1)[:k]
+
+
+PROFILE_PLACEHOLDER = "—"  # shown until /api/stock/info fills the field in
+
+
+def _fast_metrics(symbol, hist, period):
+    """Metrics derivable from price history alone (no Yahoo request beyond the bars)."""
+    current_price = round(hist["Close"].iloc[-1], 2)
+    start_price = round(hist["Close"].iloc[0], 2)
+    roi = round(((current_price - start_price) / start_price) * 100, 2)
+    high_52w = round(hist["Close"].max(), 2)
+    low_52w = round(hist["Close"].min(), 2)
+    avg_volume = int(hist["Volume"].mean())
+
+    return {
+        "symbol": symbol,
+        "name": symbol,
+        "currentPrice": current_price,
+        "startPrice": start_price,
+        "roi": roi,
+        "high52w": high_52w,
+        "low52w": low_52w,
+        "avgVolume": f"{avg_volume:,}",
+        "marketCap": PROFILE_PLACEHOLDER,
+        "pe": PROFILE_PLACEHOLDER,
+        "eps": PROFILE_PLACEHOLDER,
+        "dividend": PROFILE_PLACEHOLDER,
+        "sector": PROFILE_PLACEHOLDER,
+        "industry": PROFILE_PLACEHOLDER,
+        "beta": PROFILE_PLACEHOLDER,
+        "period": period,
+    }
+
+
+def _enrich_metrics(symbol):
+    """Profile fields from ticker.info, cached for an hour since they rarely change."""
+    def build():
+        info = _get_info(symbol)
+        profile = {
+            "symbol": symbol,
+            "name": info.get("shortName", symbol),
+            "marketCap": _format_number(info.get("marketCap", 0)),
+            "pe": info.get("trailingPE", "N/A"),
+            "eps": info.get("trailingEps", "N/A"),
+            "dividend": info.get("dividendYield", 0),
+            "sector": info.get("sector", "N/A"),
+            "industry": info.get("industry", "N/A"),
+            "beta": info.get("beta", "N/A"),
+        }
+
+        if profile["dividend"] and profile["dividend"] != "N/A":
+            profile["dividend"] = f"{round(profile['dividend'] * 100, 2)}%"
+        else:
+            profile["dividend"] = "N/A"
+
+        if profile["pe"] and profile["pe"] != "N/A":
+            profile["pe"] = round(float(profile["pe"]), 2)
+        return profile
+
+    return _cached(_profile_cache, ("profile", symbol), build)
+
+
+_NUMBER_UNITS = ((1e12, "T"), (1e9, "B"), (1e6, "M"))  # largest first
+
+
 def _format_number(num):
     if not num or num == "N/A":
         return "N/A"
     num = float(num)
-    if num >= 1e12:
-        return f"${num/1e12:.2f}T"
-    elif num >= 1e9:
-        return f"${num/1e9:.2f}B"
-    elif num >= 1e6:
-        return f"${num/1e6:.2f}M"
-    else:
-        return f"${num:,.0f}"
+    for threshold, suffix in _NUMBER_UNITS:
+        if num >= threshold:
+            return f"${num/threshold:.2f}{suffix}"
+    return f"${num:,.0f}"
 
 
 if __name__ == "__main__":
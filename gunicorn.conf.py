@@ -0,0 +1,20 @@
+# gevent workers park idle SSE clients on greenlets instead of OS threads,
+# so one worker can hold many /stream/* connections open.
+bind = "0.0.0.0:8000"
+workers = 4
+worker_class = "gevent"
+worker_connections = 1000
+
+# Keep preload off: the live price threads start on import and would not
+# survive the fork into each worker.
+preload_app = False
+
+
+def on_starting(server):
+    """Compile the Numba kernels once in the master.
+
+    Workers fork with the compiled dispatchers already in memory, so no
+    worker (and no first request) pays JIT time, and the on-disk cache
+    is written by a single process instead of four racing ones.
+    """
+    import indicators  # noqa: F401  (import runs _warmup)
@@ -0,0 +1,218 @@
+import numpy as np
+from numba import njit
+
+# ─── INDICATOR KERNELS (Numba) ───────────────────────────
+# Each kernel takes a float64 close array and fills preallocated
+# outputs in a single native pass. Warm-up values are NaN, matching
+# what the pandas rolling/ewm versions produced. Kernels release the
+# GIL, so concurrent request threads can run them side by side.
+# No fastmath: it would let LLVM assume the NaN warm-up values away.
+
+
+@njit(cache=True, nogil=True)
+def rsi_nb(close, period=14):
+    """RSI with Wilder smoothing of average gain / loss."""
+    n = close.shape[0]
+    out = np.empty(n)
+    out[:] = np.nan
+    if n <= period:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            avg_gain += d
+        else:
+            avg_loss -= d
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period, n):
+        if i > period:
+            d = close[i] - close[i - 1]
+            gain = d if d > 0 else 0.0
+            loss = -d if d < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd_nb(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram (EMAs seeded like adjust=False)."""
+    n = close.shape[0]
+    macd_line = np.empty(n)
+    signal_line = np.empty(n)
+    macd_hist = np.empty(n)
+    if n == 0:
+        return macd_line, signal_line, macd_hist
+
+    a_fast = 2.0 / (fast + 1)
+    a_slow = 2.0 / (slow + 1)
+    a_sig = 2.0 / (signal + 1)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    ema_sig = 0.0
+    for i in range(n):
+        x = close[i]
+        ema_fast = a_fast * x + (1.0 - a_fast) * ema_fast
+        ema_slow = a_slow * x + (1.0 - a_slow) * ema_slow
+        m = ema_fast - ema_slow
+        ema_sig = m if i == 0 else a_sig * m + (1.0 - a_sig) * ema_sig
+        macd_line[i] = m
+        signal_line[i] = ema_sig
+        macd_hist[i] = m - ema_sig
+    return macd_line, signal_line, macd_hist
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean_std(x, w):
+    """Rolling mean and sample std over window w via a sliding Welford update."""
+    n = x.shape[0]
+    mean_out = np.empty(n)
+    std_out = np.empty(n)
+    mean_out[:] = np.nan
+    std_out[:] = np.nan
+    if n < w:
+        return mean_out, std_out
+
+    mean = 0.0
+    m2 = 0.0
+    for i in range(w):
+        d = x[i] - mean
+        mean += d / (i + 1)
+        m2 += d * (x[i] - mean)
+
+    for i in range(w - 1, n):
+        if i >= w:
+            x_new = x[i]
+            x_old = x[i - w]
+            new_mean = mean + (x_new - x_old) / w
+            m2 += (x_new - x_old) * (x_new - new_mean + x_old - mean)
+            mean = new_mean
+        mean_out[i] = mean
+        std_out[i] = np.sqrt(max(m2, 0.0) / (w - 1)) if w > 1 else 0.0
+    return mean_out, std_out
+
+
+@njit(cache=True, nogil=True)
+def bollinger_nb(close, window=20, num_std=2.0):
+    """Rolling SMA and upper/lower bands (sample std)."""
+    sma, std = rolling_mean_std(close, window)
+    return sma, sma + num_std * std, sma - num_std * std
+
+
+@njit(cache=True, nogil=True)
+def compute_all(close):
+    """Every /api/strategy indicator in one pass over close.
+
+    Returns (rsi, macd_line, signal_line, macd_hist, sma20, upper_bb,
+    lower_bb, sma50, sma200); all running state stays in locals.
+    """
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    macd_line = np.empty(n)
+    signal_line = np.empty(n)
+    macd_hist = np.empty(n)
+    sma20 = np.full(n, np.nan)
+    upper_bb = np.full(n, np.nan)
+    lower_bb = np.full(n, np.nan)
+    sma50 = np.full(n, np.nan)
+    sma200 = np.full(n, np.nan)
+    if n == 0:
+        return rsi, macd_line, signal_line, macd_hist, sma20, upper_bb, lower_bb, sma50, sma200
+
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+    ema12 = close[0]
+    ema26 = close[0]
+    ema9 = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    mean20 = 0.0
+    m2_20 = 0.0
+    sum50 = 0.0
+    sum200 = 0.0
+
+    for i in range(n):
+        x = close[i]
+
+        # RSI (14, Wilder)
+        if i > 0:
+            d = x - close[i - 1]
+            gain = d if d > 0 else 0.0
+            loss = -d if d < 0 else 0.0
+            if i <= 14:
+                avg_gain += gain / 14.0
+                avg_loss += loss / 14.0
+            else:
+                avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                avg_loss = (avg_loss * 13.0 + loss) / 14.0
+            if i >= 14:
+                rsi[i] = 100.0 if avg_loss == 0.0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        # MACD (12, 26, 9)
+        ema12 = a12 * x + (1.0 - a12) * ema12
+        ema26 = a26 * x + (1.0 - a26) * ema26
+        m = ema12 - ema26
+        ema9 = m if i == 0 else a9 * m + (1.0 - a9) * ema9
+        macd_line[i] = m
+        signal_line[i] = ema9
+        macd_hist[i] = m - ema9
+
+        # Bollinger (20, 2σ) via sliding Welford
+        if i < 20:
+            d = x - mean20
+            mean20 += d / (i + 1)
+            m2_20 += d * (x - mean20)
+        else:
+            x_old = close[i - 20]
+            new_mean = mean20 + (x - x_old) / 20.0
+            m2_20 += (x - x_old) * (x - new_mean + x_old - mean20)
+            mean20 = new_mean
+        if i >= 19:
+            std = np.sqrt(max(m2_20, 0.0) / 19.0)
+            sma20[i] = mean20
+            upper_bb[i] = mean20 + 2.0 * std
+            lower_bb[i] = mean20 - 2.0 * std
+
+        # SMA 50 / 200 via add-new / subtract-old
+        sum50 += x
+        sum200 += x
+        if i >= 50:
+            sum50 -= close[i - 50]
+        if i >= 200:
+            sum200 -= close[i - 200]
+        if i >= 49:
+            sma50[i] = sum50 / 50.0
+        if i >= 199:
+            sma200[i] = sum200 / 200.0
+
+    return rsi, macd_line, signal_line, macd_hist, sma20, upper_bb, lower_bb, sma50, sma200
+
+
+def _warmup():
+    """Compile every kernel at import so the first request doesn't pay JIT latency.
+
+    Numba specializes on writeability, and pandas hands out read-only arrays
+    from Series.to_numpy(), so both variants are compiled.
+    """
+    dummy = np.linspace(100.0, 110.0, 50)
+    readonly = dummy.copy()
+    readonly.flags.writeable = False
+    for arr in (dummy, readonly):
+        rsi_nb(arr)
+        macd_nb(arr)
+        bollinger_nb(arr)
+        rolling_mean_std(arr, 20)
+        compute_all(arr)
+
+
+_warmup()
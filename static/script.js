@@ -55,12 +55,15 @@ async function analyzeStock() {
         show("metricsSection");
         show("chartsSection");
 
+        // Profile fields (name, sector, P/E, ...) load after the charts are visible
+        const info = await loadStockInfo(symbol, period);
+
         // Add chat message
         addBotMessage(
-            `✅ Analysis complete for <strong>${data.metrics.name} (${symbol})</strong>!<br><br>` +
+            `✅ Analysis complete for <strong>${info ? info.name : symbol} (${symbol})</strong>!<br><br>` +
             `💰 Price: <strong>$${data.metrics.currentPrice}</strong><br>` +
             `📈 ROI (${period}): <strong>${data.metrics.roi}%</strong><br>` +
-            `🏢 Sector: ${data.metrics.sector}<br><br>` +
+            `🏢 Sector: ${info ? info.sector : "N/A"}<br><br>` +
             `Click <strong>Analyze News</strong> for sentiment analysis!`
         );
 
@@ -127,6 +130,18 @@ function populateMetrics(m) {
     document.getElementById("stockTitle").innerHTML =
         `${m.name} <span style="color:#64748b">(${m.symbol})</span> — ${m.period.toUpperCase()}`;
 
+    populatePriceMetrics(m);
+    document.getElementById("mCap").textContent = m.marketCap;
+    document.getElementById("mPE").textContent = m.pe;
+    document.getElementById("mEPS").textContent = m.eps;
+    document.getElementById("mDiv").textContent = m.dividend;
+    document.getElementById("mBeta").textContent = m.beta;
+    document.getElementById("mSector").textContent = m.sector;
+    document.getElementById("mIndustry").textContent = m.industry;
+}
+
+// Price-derived fields only; the profile fields come from /api/stock/info.
+function populatePriceMetrics(m) {
     document.getElementById("mPrice").textContent = `$${m.currentPrice}`;
 
     const roiEl = document.getElementById("mROI");
@@ -135,14 +150,38 @@ function populateMetrics(m) {
 
     document.getElementById("mHigh").textContent = `$${m.high52w}`;
     document.getElementById("mLow").textContent = `$${m.low52w}`;
-    document.getElementById("mCap").textContent = m.marketCap;
-    document.getElementById("mPE").textContent = m.pe;
-    document.getElementById("mEPS").textContent = m.eps;
-    document.getElementById("mDiv").textContent = m.dividend;
-    document.getElementById("mBeta").textContent = m.beta;
     document.getElementById("mVol").textContent = m.avgVolume;
-    document.getElementById("mSector").textContent = m.sector;
-    document.getElementById("mIndustry").textContent = m.industry;
+}
+
+// ─── STOCK PROFILE ───────────────────────────────────
+async function loadStockInfo(symbol, period) {
+    try {
+        const res = await fetch("/api/stock/info", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ symbol }),
+        });
+        const info = await res.json();
+        if (info.error || symbol !== currentSymbol) return null;
+        populateProfile(info, period);
+        return info;
+    } catch (err) {
+        console.error(err);
+        return null;
+    }
+}
+
+function populateProfile(info, period) {
+    document.getElementById("stockTitle").innerHTML =
+        `${info.name} <span style="color:#64748b">(${info.symbol})</span> — ${period.toUpperCase()}`;
+
+    document.getElementById("mCap").textContent = info.marketCap;
+    document.getElementById("mPE").textContent = info.pe;
+    document.getElementById("mEPS").textContent = info.eps;
+    document.getElementById("mDiv").textContent = info.dividend;
+    document.getElementById("mBeta").textContent = info.beta;
+    document.getElementById("mSector").textContent = info.sector;
+    document.getElementById("mIndustry").textContent = info.industry;
 }
 
 // ─── SHOW CHART ──────────────────────────────────────
@@ -752,8 +791,8 @@ refreshInterval = setInterval(() => {
         })
         .then(res => res.json())
         .then(data => {
-            if (!data.error) {
-                populateMetrics(data.metrics);
+            if (!data.error && symbol === currentSymbol) {
+                populatePriceMetrics(data.metrics);
                 currentCharts = data.charts;
                 // Re-render active chart
                 const activeTab = document.querySelector(".chart-tabs .tab.active");
@@ -0,0 +1,8 @@
+"""Production entry point: gunicorn loads settings from gunicorn.conf.py.
+
+    gunicorn wsgi:app
+"""
+from gevent import monkey
+monkey.patch_all()  # must run before app imports threading/requests
+
+from app import app